@@ -1,39 +1,175 @@
+import asyncio
 import logging
-from typing import Optional, List
-from datetime import datetime
-from sqlalchemy import select, update
+from dataclasses import dataclass
+from typing import Dict, Optional, List
+from cachetools import TTLCache
+import redis.asyncio as aioredis
+from sqlalchemy import select, update, or_, bindparam
 from database import db_manager, User
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Redis channel used to drop cached flags across workers/processes
+INVALIDATE_CHANNEL = "auth:invalidate"
+
+# Per-user flag/profile lookups (bound with uid) and the cache warmup query
+_SEL_FLAGS = select(User.is_admin, User.is_banned).where(User.id == bindparam("uid"))
+_SEL_USER_FULL = select(User).where(User.id == bindparam("uid"))
+_SEL_PRIVILEGED_FLAGS = (
+    select(User.id, User.is_admin, User.is_banned)
+    .where(or_(User.is_admin == True, User.is_banned == True))
+)
+
+# Columns returned by the admin/banned user listings
+_USER_LIST_COLUMNS = (
+    User.id,
+    User.username,
+    User.first_name,
+    User.last_name,
+    User.created_at,
+    User.last_seen,
+)
+_SEL_ADMINS = select(*_USER_LIST_COLUMNS).where(User.is_admin == True)
+_SEL_BANNED = select(*_USER_LIST_COLUMNS).where(User.is_banned == True)
+
+
+@dataclass(frozen=True)
+class UserFlags:
+    """Cached authorization flags for a single user"""
+    is_admin: bool = False
+    is_banned: bool = False
+
 
 class AuthManager:
     """Handles authentication and authorization for the bot"""
     
     def __init__(self):
-        self.admin_cache = set(settings.ADMIN_USER_IDS)
-        self.banned_cache = set()
+        self._static_admins = settings.ADMIN_USER_IDS  # already a frozenset
+        self._user_cache: TTLCache = TTLCache(
+            maxsize=settings.AUTH_CACHE_SIZE,
+            ttl=settings.AUTH_CACHE_TTL
+        )
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._redis = (
+            aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+            if settings.REDIS_URL else None
+        )
+        self._subscriber_task: Optional[asyncio.Task] = None
+        # Bumped on every invalidation so reads that raced with it aren't cached
+        self._generations: Dict[int, int] = {}
+    
+    async def warmup(self):
+        """Preload flags of all admins and banned users with a single query"""
+        try:
+            generations = dict(self._generations)
+            async with db_manager.session_scope() as session:
+                result = await session.execute(_SEL_PRIVILEGED_FLAGS)
+                rows = result.all()
+            
+            for user_id, is_admin, is_banned in rows:
+                if self._generations.get(user_id, 0) == generations.get(user_id, 0):
+                    self._user_cache[user_id] = UserFlags(bool(is_admin), bool(is_banned))
+            
+            logger.info(f"Authentication cache warmed with {len(rows)} users")
+            
+        except Exception as e:
+            logger.error(f"Error warming authentication cache: {e}")
+    
+    def start_background_tasks(self):
+        """Start cache re-warming and, if Redis is configured, invalidation listening"""
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._periodic_refresh())
+        if self._redis and self._subscriber_task is None:
+            self._subscriber_task = asyncio.create_task(self._subscribe_invalidations())
+    
+    async def _periodic_refresh(self):
+        while True:
+            await asyncio.sleep(settings.AUTH_CACHE_TTL)
+            await self.warmup()
+    
+    async def _subscribe_invalidations(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub()
+                await pubsub.subscribe(INVALIDATE_CHANNEL)
+                try:
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        try:
+                            self._drop(int(message["data"]))
+                        except ValueError:
+                            logger.warning(f"Ignoring invalid auth invalidation: {message['data']!r}")
+                finally:
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Auth invalidation subscriber error: {e}")
+                await asyncio.sleep(5)
+    
+    def _drop(self, user_id: int):
+        """Drop cached flags and bump the user's invalidation generation"""
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        self._user_cache.pop(user_id, None)
+    
+    async def _invalidate(self, user_id: int):
+        """Drop cached flags locally and tell other workers to do the same"""
+        self._drop(user_id)
+        if self._redis:
+            try:
+                await self._redis.publish(INVALIDATE_CHANNEL, str(user_id))
+            except Exception as e:
+                logger.error(f"Error publishing auth invalidation for {user_id}: {e}")
+    
+    async def close(self):
+        """Stop background tasks and close the Redis connection"""
+        for task in (self._refresh_task, self._subscriber_task):
+            if task:
+                task.cancel()
+        self._refresh_task = None
+        self._subscriber_task = None
+        if self._redis:
+            await self._redis.aclose()
+    
+    async def get_user_flags(self, user_id: int) -> UserFlags:
+        """Get admin/banned flags for a user, loading them from the database on cache miss"""
+        flags = self._user_cache.get(user_id)
+        if flags is not None:
+            return flags
+        
+        generation = self.generation(user_id)
+        async with db_manager.session_scope() as session:
+            result = await session.execute(_SEL_FLAGS, {"uid": user_id})
+            row = result.first()
+        
+        flags = UserFlags(bool(row.is_admin), bool(row.is_banned)) if row else UserFlags()
+        self.cache_user_flags(user_id, flags, generation)
+        return flags
+    
+    def generation(self, user_id: int) -> int:
+        """Current invalidation generation; read it before querying flags to cache"""
+        return self._generations.get(user_id, 0)
+    
+    def cache_user_flags(self, user_id: int, flags: UserFlags, generation: int):
+        """Store flags already fetched elsewhere (e.g. during user registration).
+        
+        The write is skipped if the user was invalidated after `generation` was
+        read, since the flags may predate a ban or demotion.
+        """
+        if self._generations.get(user_id, 0) == generation:
+            self._user_cache[user_id] = flags
     
     async def is_admin(self, user_id: int) -> bool:
         """Check if user is an admin"""
         try:
-            # Check cache first
-            if user_id in self.admin_cache:
+            # Statically configured admins bypass the cache
+            if user_id in self._static_admins:
                 return True
             
-            # Check database
-            async with db_manager.get_session() as session:
-                result = await session.execute(
-                    select(User).where(User.id == user_id)
-                )
-                user = result.scalar_one_or_none()
-                
-                if user and user.is_admin:
-                    self.admin_cache.add(user_id)
-                    return True
-            
-            return False
+            flags = await self.get_user_flags(user_id)
+            return flags.is_admin
             
         except Exception as e:
             logger.error(f"Error checking admin status for user {user_id}: {e}")
@@ -46,22 +182,8 @@ class AuthManager:
     async def is_user_allowed(self, user_id: int) -> bool:
         """Check if user is allowed to use the bot (not banned)"""
         try:
-            # Check cache first
-            if user_id in self.banned_cache:
-                return False
-            
-            # Check database
-            async with db_manager.get_session() as session:
-                result = await session.execute(
-                    select(User).where(User.id == user_id)
-                )
-                user = result.scalar_one_or_none()
-                
-                if user and user.is_banned:
-                    self.banned_cache.add(user_id)
-                    return False
-            
-            return True
+            flags = await self.get_user_flags(user_id)
+            return not flags.is_banned
             
         except Exception as e:
             logger.error(f"Error checking user permission for {user_id}: {e}")
@@ -78,7 +200,7 @@ class AuthManager:
             if user_id == settings.SUPER_ADMIN_ID:
                 return False
             
-            async with db_manager.get_session() as session:
+            async with db_manager.session_scope() as session:
                 # Update user ban status
                 await session.execute(
                     update(User)
@@ -87,8 +209,8 @@ class AuthManager:
                 )
                 await session.commit()
                 
-                # Update cache
-                self.banned_cache.add(user_id)
+                # Invalidate cache on every worker
+                await self._invalidate(user_id)
                 
                 logger.info(f"User {user_id} banned by admin {admin_id}")
                 return True
@@ -104,7 +226,7 @@ class AuthManager:
             if not await self.is_admin(admin_id):
                 return False
             
-            async with db_manager.get_session() as session:
+            async with db_manager.session_scope() as session:
                 # Update user ban status
                 await session.execute(
                     update(User)
@@ -113,8 +235,8 @@ class AuthManager:
                 )
                 await session.commit()
                 
-                # Update cache
-                self.banned_cache.discard(user_id)
+                # Invalidate cache on every worker
+                await self._invalidate(user_id)
                 
                 logger.info(f"User {user_id} unbanned by admin {admin_id}")
                 return True
@@ -130,7 +252,7 @@ class AuthManager:
             if not await self.is_super_admin(super_admin_id):
                 return False
             
-            async with db_manager.get_session() as session:
+            async with db_manager.session_scope() as session:
                 # Update user admin status
                 await session.execute(
                     update(User)
@@ -139,8 +261,8 @@ class AuthManager:
                 )
                 await session.commit()
                 
-                # Update cache
-                self.admin_cache.add(user_id)
+                # Invalidate cache on every worker
+                await self._invalidate(user_id)
                 
                 logger.info(f"User {user_id} promoted to admin by super admin {super_admin_id}")
                 return True
@@ -160,7 +282,7 @@ class AuthManager:
             if user_id == settings.SUPER_ADMIN_ID:
                 return False
             
-            async with db_manager.get_session() as session:
+            async with db_manager.session_scope() as session:
                 # Update user admin status
                 await session.execute(
                     update(User)
@@ -169,8 +291,8 @@ class AuthManager:
                 )
                 await session.commit()
                 
-                # Update cache
-                self.admin_cache.discard(user_id)
+                # Invalidate cache on every worker
+                await self._invalidate(user_id)
                 
                 logger.info(f"User {user_id} demoted from admin by super admin {super_admin_id}")
                 return True
@@ -182,10 +304,8 @@ class AuthManager:
     async def get_user_info(self, user_id: int) -> Optional[dict]:
         """Get detailed user information"""
         try:
-            async with db_manager.get_session() as session:
-                result = await session.execute(
-                    select(User).where(User.id == user_id)
-                )
+            async with db_manager.session_scope() as session:
+                result = await session.execute(_SEL_USER_FULL, {"uid": user_id})
                 user = result.scalar_one_or_none()
                 
                 if user:
@@ -209,23 +329,11 @@ class AuthManager:
     async def get_all_admins(self) -> List[dict]:
         """Get list of all admins"""
         try:
-            async with db_manager.get_session() as session:
-                result = await session.execute(
-                    select(User).where(User.is_admin == True)
-                )
-                admins = result.scalars().all()
+            async with db_manager.session_scope() as session:
+                # Plain column rows, skipping ORM hydration
+                result = await session.execute(_SEL_ADMINS)
                 
-                return [
-                    {
-                        'id': admin.id,
-                        'username': admin.username,
-                        'first_name': admin.first_name,
-                        'last_name': admin.last_name,
-                        'created_at': admin.created_at,
-                        'last_seen': admin.last_seen
-                    }
-                    for admin in admins
-                ]
+                return [dict(row) for row in result.mappings().all()]
                 
         except Exception as e:
             logger.error(f"Error getting admin list: {e}")
@@ -234,23 +342,11 @@ class AuthManager:
     async def get_banned_users(self) -> List[dict]:
         """Get list of all banned users"""
         try:
-            async with db_manager.get_session() as session:
-                result = await session.execute(
-                    select(User).where(User.is_banned == True)
-                )
-                banned_users = result.scalars().all()
+            async with db_manager.session_scope() as session:
+                # Plain column rows, skipping ORM hydration
+                result = await session.execute(_SEL_BANNED)
                 
-                return [
-                    {
-                        'id': user.id,
-                        'username': user.username,
-                        'first_name': user.first_name,
-                        'last_name': user.last_name,
-                        'created_at': user.created_at,
-                        'last_seen': user.last_seen
-                    }
-                    for user in banned_users
-                ]
+                return [dict(row) for row in result.mappings().all()]
                 
         except Exception as e:
             logger.error(f"Error getting banned users list: {e}")
@@ -258,6 +354,5 @@ class AuthManager:
     
     def clear_cache(self):
         """Clear authentication cache"""
-        self.admin_cache = set(settings.ADMIN_USER_IDS)
-        self.banned_cache = set()
+        self._user_cache.clear()
         logger.info("Authentication cache cleared")
@@ -1,35 +1,138 @@
+import ast
 import asyncio
+import json
 import logging
-from datetime import datetime
+from dataclasses import replace
+from functools import wraps
+from datetime import datetime, timedelta
 from typing import Optional
+from cachetools import TTLCache
 from pyrogram import Client, filters, types
 from pyrogram.handlers import MessageHandler, CallbackQueryHandler
-from pyrogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
-from sqlalchemy import select, update
+from sqlalchemy import select, func, desc, bindparam, cast, Text
 from database import db_manager, User, TorrentUpload, ChatSettings
 from config import settings
-from utils import TorrentValidator, format_file_size, is_admin, get_user_info
-from auth import AuthManager
+from utils import TorrentValidator, format_file_size, is_admin, get_user_info, shutdown_cpu_pool
+from auth import AuthManager, UserFlags
+from bot_texts import (
+    WELCOME_TEXT, WELCOME_KEYBOARD, HELP_TEXT, ADMIN_PANEL_TEXT, ADMIN_KEYBOARD,
+    USER_MANAGEMENT_TEXT, USER_MANAGEMENT_KEYBOARD, ADMIN_SETTINGS_TEXT, BACK_TO_ADMIN_KEYBOARD,
+    INVALID_FILE_TYPE_TEXT, FILE_TOO_LARGE_TEXT
+)
 
 logger = logging.getLogger(__name__)
 
+# Torrents up to this size are downloaded into memory instead of a temp file
+_IN_MEMORY_DOWNLOAD_LIMIT = 10 * 1024 * 1024
+
+# Per-user statistics queries for /stats, parameterised by uid
+_SEL_USER_UPLOAD_TOTALS = select(
+    func.count(TorrentUpload.id),
+    func.sum(TorrentUpload.file_size),
+    func.min(TorrentUpload.upload_date)
+).where(TorrentUpload.user_id == bindparam("uid"))
+_SEL_RECENT_UPLOADS = (
+    select(TorrentUpload.file_name, TorrentUpload.file_size)
+    .where(TorrentUpload.user_id == bindparam("uid"))
+    .order_by(TorrentUpload.upload_date.desc())
+    .limit(5)
+)
+# torrent_info is read as text so rows written before it became a JSON column
+# (str(dict) values, or a TEXT column on PostgreSQL) still load
+_SEL_UPLOAD_BY_MESSAGE = (
+    select(
+        TorrentUpload.file_name,
+        TorrentUpload.user_id,
+        TorrentUpload.upload_date,
+        TorrentUpload.file_size,
+        cast(TorrentUpload.torrent_info, Text).label("torrent_info")
+    )
+    .where(TorrentUpload.message_id == bindparam("mid"))
+    .order_by(TorrentUpload.upload_date.desc())
+    .limit(1)
+)
+# Global totals in one round-trip; the active-user count is a range scan on ix_user_last_seen
+_SEL_GLOBAL_TOTALS = select(
+    select(func.count(TorrentUpload.id)).scalar_subquery(),
+    select(func.sum(TorrentUpload.file_size)).scalar_subquery(),
+    select(func.count(User.id)).scalar_subquery(),
+    select(func.count(User.id)).where(User.last_seen > bindparam("cutoff")).scalar_subquery()
+)
+_SEL_TOP_UPLOADERS = (
+    select(TorrentUpload.user_id, func.count(TorrentUpload.id).label("upload_count"))
+    .group_by(TorrentUpload.user_id)
+    .order_by(desc("upload_count"))
+    .limit(5)
+)
+
+
+def _load_torrent_info(raw: Optional[str]) -> dict:
+    """Parse stored torrent metadata; anything unreadable is treated as missing"""
+    if not raw:
+        return {}
+    try:
+        info = json.loads(raw)
+    except ValueError:
+        # Legacy rows stored str(dict)
+        try:
+            info = ast.literal_eval(raw)
+        except (ValueError, SyntaxError):
+            return {}
+    return info if isinstance(info, dict) else {}
+
+
+async def _reply_error(update, text: str):
+    """Report a handler failure to the user via message reply or callback answer"""
+    try:
+        if isinstance(update, types.CallbackQuery):
+            await update.answer(text)
+        else:
+            await update.reply_text(text)
+    except Exception:
+        logger.exception("Failed to report handler error")
+
+
+def safe_handler(error_text: str):
+    """Log and report any exception raised by a handler instead of propagating it"""
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(self, client, update, *args, **kwargs):
+            try:
+                return await fn(self, client, update, *args, **kwargs)
+            except Exception:
+                logger.exception(f"Error in {fn.__name__}")
+                await _reply_error(update, error_text)
+        return wrapper
+    return decorator
+
 
 class TorrentBot:
     def __init__(self):
-        self.app = Client(
-            name=settings.SESSION_NAME,
-            api_id=settings.API_ID,
-            api_hash=settings.API_HASH,
-            bot_token=settings.BOT_TOKEN,
-            workers=settings.WORKERS
-        )
-        self.auth_manager = AuthManager()
-        self.torrent_validator = TorrentValidator()
+        # Client, auth and validator are created in start() so that
+        # importing/constructing the bot has no side effects
+        self.app: Optional[Client] = None
+        self.auth_manager: Optional[AuthManager] = None
+        self.torrent_validator: Optional[TorrentValidator] = None
+        # user_id -> profile signature of the last upsert; skips repeat
+        # upserts for active users at the cost of last_seen lagging <= 60s
+        self._register_skip: TTLCache = TTLCache(maxsize=50_000, ttl=60)
         
     async def start(self):
         """Start the bot"""
         try:
+            self.app = Client(
+                name=settings.SESSION_NAME,
+                api_id=settings.API_ID,
+                api_hash=settings.API_HASH,
+                bot_token=settings.BOT_TOKEN,
+                workers=settings.WORKERS
+            )
+            self.auth_manager = AuthManager()
+            self.torrent_validator = TorrentValidator()
+            
             await db_manager.init_db()
+            await self.auth_manager.warmup()
+            self.auth_manager.start_background_tasks()
             await self.app.start()
             logger.info(f"Bot {settings.BOT_NAME} started successfully!")
             
@@ -45,7 +148,11 @@ class TorrentBot:
     
     async def stop(self):
         """Stop the bot"""
-        await self.app.stop()
+        if self.app and self.app.is_connected:
+            await self.app.stop()
+        if self.auth_manager:
+            await self.auth_manager.close()
+        shutdown_cpu_pool()
         await db_manager.close()
         logger.info("Bot stopped")
     
@@ -63,171 +170,122 @@ class TorrentBot:
         # Callback query handlers
         self.app.add_handler(CallbackQueryHandler(self.handle_callback))
     
-    async def start_command(self, client: Client, message: Message):
+    @safe_handler("❌ An error occurred. Please try again later.")
+    async def start_command(self, client: Client, message: types.Message):
         """Handle /start command"""
-        try:
-            await self.register_user(message.from_user, message.chat.id)
-            
-            welcome_text = f"""
-🐍 **Welcome to {settings.BOT_NAME}!**
-*by @medusaXD*
-
-I'm a powerful torrent downloader bot that helps you manage and share torrent files with advanced features.
-
-**🔥 Features:**
-• Upload and validate torrent files
-• Support for both private chats and groups
-• Admin authentication system
-• File size validation up to 2GB
-• Torrent metadata extraction
-• Multi-user concurrent support
-
-**📋 Commands:**
-/help - Show detailed help
-/stats - View upload statistics
-/admin - Admin panel (admins only)
-
-**🚀 Usage:**
-Simply send me a .torrent file and I'll process it for you!
-
-**✅ Supported in:**
-• Private chats
-• Groups and supergroups
-• Multi-user environments
-"""
-            
-            keyboard = InlineKeyboardMarkup([
-                [InlineKeyboardButton("📚 Help", callback_data="help")],
-                [InlineKeyboardButton("📊 Stats", callback_data="stats")]
-            ])
-            
-            await message.reply_text(welcome_text, reply_markup=keyboard)
-            
-        except Exception as e:
-            logger.error(f"Error in start command: {e}")
-            await message.reply_text("❌ An error occurred. Please try again later.")
-    
-    async def help_command(self, client: Client, message: Message):
-        """Handle /help command"""
-        help_text = f"""
-📚 **{settings.BOT_NAME} Help**
-*by @medusaXD*
-
-**🚀 Basic Usage:**
-1. Send me a .torrent file
-2. I'll validate and process it
-3. Get detailed torrent information
-
-**📋 Commands:**
-/start - Start the bot
-/help - Show this help message
-/stats - View your upload statistics
-/admin - Admin panel (admins only)
-
-**📁 File Requirements:**
-• File type: .torrent only
-• Max size: {settings.MAX_FILE_SIZE}MB (2GB)
-• Must be a valid torrent file
-
-**👑 Admin Features:**
-• User management
-• Ban/unban users
-• View all statistics
-• Chat settings management
-
-**🌐 Multi-Platform Support:**
-This bot works in both private chats and groups!
-Perfect for torrent communities and individual users.
-
-**🔥 Powered by MedusaXD**
-"""
+        await self.register_user(message.from_user, message.chat.id)
         
-        await message.reply_text(help_text)
+        await message.reply_text(WELCOME_TEXT, reply_markup=WELCOME_KEYBOARD)
+
+    async def help_command(self, client: Client, message: types.Message):
+        """Handle /help command"""
+        await message.reply_text(HELP_TEXT)
     
-    async def register_user(self, user: types.User, chat_id: int):
-        """Register or update user in database"""
+    async def register_user(self, user: types.User, chat_id: int) -> UserFlags:
+        """Register or update user in database and return their auth flags"""
+        is_static_admin = user.id in settings.ADMIN_USER_IDS
         try:
-            async with db_manager.get_session() as session:
-                # Check if user exists
-                result = await session.execute(
-                    select(User).where(User.id == user.id)
-                )
-                existing_user = result.scalar_one_or_none()
-                
-                if existing_user:
-                    # Update existing user
-                    existing_user.username = user.username
-                    existing_user.first_name = user.first_name
-                    existing_user.last_name = user.last_name
-                    existing_user.last_seen = datetime.utcnow()
-                else:
-                    # Create new user
-                    new_user = User(
-                        id=user.id,
-                        username=user.username,
-                        first_name=user.first_name,
-                        last_name=user.last_name,
-                        is_admin=user.id in settings.ADMIN_USER_IDS
-                    )
-                    session.add(new_user)
-                
+            signature = (user.username, user.first_name, user.last_name)
+            if self._register_skip.get(user.id) == signature:
+                flags = await self.auth_manager.get_user_flags(user.id)
+                if is_static_admin and not flags.is_admin:
+                    flags = replace(flags, is_admin=True)
+                return flags
+
+            now = datetime.utcnow()
+            stmt = db_manager.insert(User).values(
+                id=user.id,
+                username=user.username,
+                first_name=user.first_name,
+                last_name=user.last_name,
+                is_admin=is_static_admin,
+                created_at=now,
+                last_seen=now
+            )
+            # Insert or refresh profile fields in one statement, without racing
+            # concurrent first messages from the same user
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[User.id],
+                set_={
+                    'username': stmt.excluded.username,
+                    'first_name': stmt.excluded.first_name,
+                    'last_name': stmt.excluded.last_name,
+                    'last_seen': stmt.excluded.last_seen
+                }
+            ).returning(User.is_admin, User.is_banned)
+
+            generation = self.auth_manager.generation(user.id)
+            async with db_manager.session_scope() as session:
+                result = await session.execute(stmt)
+                row = result.one()
                 await session.commit()
+
+            flags = UserFlags(
+                is_admin=bool(row.is_admin) or is_static_admin,
+                is_banned=bool(row.is_banned)
+            )
+
+            # Later checks in the same update flow are served from memory
+            self.auth_manager.cache_user_flags(user.id, flags, generation)
+            self._register_skip[user.id] = signature
+            return flags
                 
         except Exception as e:
             logger.error(f"Error registering user {user.id}: {e}")
+            return UserFlags(is_admin=is_static_admin)
 
-    async def handle_document(self, client: Client, message: Message):
+    @safe_handler("❌ An error occurred while processing your file.")
+    async def handle_document(self, client: Client, message: types.Message):
         """Handle document uploads"""
-        try:
-            # Register user first
-            await self.register_user(message.from_user, message.chat.id)
+        # Register user first
+        flags = await self.register_user(message.from_user, message.chat.id)
+
+        # Check if user is banned
+        if flags.is_banned:
+            await message.reply_text("❌ You are banned from using this bot.")
+            return
 
-            # Check if user is banned
-            if not await self.auth_manager.is_user_allowed(message.from_user.id):
-                await message.reply_text("❌ You are banned from using this bot.")
-                return
+        document = message.document
 
-            document = message.document
+        # Check file extension
+        if not document.file_name.lower().endswith(settings.allowed_ext_tuple):
+            await message.reply_text(INVALID_FILE_TYPE_TEXT)
+            return
 
-            # Check file extension
-            if not any(document.file_name.lower().endswith(ext) for ext in settings.ALLOWED_TORRENT_EXTENSIONS):
-                await message.reply_text(
-                    f"❌ Invalid file type. Only {', '.join(settings.ALLOWED_TORRENT_EXTENSIONS)} files are allowed."
-                )
-                return
-
-            # Check file size
-            max_size_bytes = settings.MAX_FILE_SIZE * 1024 * 1024
-            if document.file_size > max_size_bytes:
-                await message.reply_text(
-                    f"❌ File too large. Maximum size is {settings.MAX_FILE_SIZE}MB. "
-                    f"Your file is {format_file_size(document.file_size)}."
-                )
-                return
+        # Check file size
+        if document.file_size > settings.max_file_size_bytes:
+            await message.reply_text(
+                FILE_TOO_LARGE_TEXT.format(size=format_file_size(document.file_size))
+            )
+            return
 
-            # Send processing message
-            processing_msg = await message.reply_text("🔄 Processing torrent file...")
+        # Send processing message
+        processing_msg = await message.reply_text("🔄 Processing torrent file...")
 
-            # Download and validate torrent
+        # Download and validate torrent; small files never touch the disk
+        if document.file_size <= _IN_MEMORY_DOWNLOAD_LIMIT:
+            buf = await message.download(in_memory=True)
+            validation_result = await self.torrent_validator.validate_bytes(buf)
+        else:
             file_path = await message.download()
             validation_result = await self.torrent_validator.validate_torrent(file_path)
 
-            if not validation_result.is_valid:
-                await processing_msg.edit_text(f"❌ Invalid torrent file: {validation_result.error}")
-                return
-
-            # Save to database
-            await self.save_torrent_upload(
-                user_id=message.from_user.id,
-                file_name=document.file_name,
-                file_size=document.file_size,
-                chat_id=message.chat.id,
-                message_id=message.id,
-                torrent_info=validation_result.metadata
-            )
+        if not validation_result.is_valid:
+            await processing_msg.edit_text(f"❌ Invalid torrent file: {validation_result.error}")
+            return
+
+        # Save to database
+        await self.save_torrent_upload(
+            user_id=message.from_user.id,
+            file_name=document.file_name,
+            file_size=document.file_size,
+            chat_id=message.chat.id,
+            message_id=message.id,
+            torrent_info=validation_result.metadata
+        )
 
-            # Create response
-            response_text = f"""
+        # Create response
+        response_text = f"""
 ✅ **Torrent Uploaded Successfully!**
 
 📁 **File:** `{document.file_name}`
@@ -240,29 +298,25 @@ Perfect for torrent communities and individual users.
 {validation_result.metadata.get('name', 'N/A')}
 """
 
-            keyboard = InlineKeyboardMarkup([
-                [InlineKeyboardButton("📊 My Stats", callback_data="user_stats")],
-                [InlineKeyboardButton("ℹ️ Torrent Info", callback_data=f"torrent_info_{message.id}")]
-            ])
-
-            await processing_msg.edit_text(response_text, reply_markup=keyboard)
+        keyboard = types.InlineKeyboardMarkup([
+            [types.InlineKeyboardButton("📊 My Stats", callback_data="user_stats")],
+            [types.InlineKeyboardButton("ℹ️ Torrent Info", callback_data=f"torrent_info_{message.id}")]
+        ])
 
-        except Exception as e:
-            logger.error(f"Error handling document: {e}")
-            await message.reply_text("❌ An error occurred while processing your file.")
+        await processing_msg.edit_text(response_text, reply_markup=keyboard)
 
     async def save_torrent_upload(self, user_id: int, file_name: str, file_size: int,
                                  chat_id: int, message_id: int, torrent_info: dict):
         """Save torrent upload to database"""
         try:
-            async with db_manager.get_session() as session:
+            async with db_manager.session_scope() as session:
                 upload = TorrentUpload(
                     user_id=user_id,
                     file_name=file_name,
                     file_size=file_size,
                     chat_id=chat_id,
                     message_id=message_id,
-                    torrent_info=str(torrent_info)
+                    torrent_info=torrent_info
                 )
                 session.add(upload)
                 await session.commit()
@@ -270,98 +324,75 @@ Perfect for torrent communities and individual users.
         except Exception as e:
             logger.error(f"Error saving torrent upload: {e}")
 
-    async def stats_command(self, client: Client, message: Message):
+    @safe_handler("❌ An error occurred while fetching statistics.")
+    async def stats_command(self, client: Client, message: types.Message):
         """Handle /stats command"""
-        try:
-            await self.register_user(message.from_user, message.chat.id)
+        await self.register_user(message.from_user, message.chat.id)
 
-            async with db_manager.get_session() as session:
-                # Get user stats
-                result = await session.execute(
-                    select(TorrentUpload).where(TorrentUpload.user_id == message.from_user.id)
-                )
-                user_uploads = result.scalars().all()
+        async with db_manager.session_scope() as session:
+            # Aggregate user stats in SQL
+            totals_result = await session.execute(
+                _SEL_USER_UPLOAD_TOTALS, {"uid": message.from_user.id}
+            )
+            total_uploads, total_size, first_upload = totals_result.one()
 
-                total_uploads = len(user_uploads)
-                total_size = sum(upload.file_size for upload in user_uploads)
+            # Last 5 uploads
+            recent_result = await session.execute(
+                _SEL_RECENT_UPLOADS, {"uid": message.from_user.id}
+            )
+            recent_uploads = recent_result.all()
 
-                stats_text = f"""
+            stats_text = f"""
 📊 **Your Statistics**
 
 👤 **User:** {get_user_info(message.from_user)}
 📁 **Total Uploads:** {total_uploads}
-💾 **Total Size:** {format_file_size(total_size)}
-📅 **Member Since:** {user_uploads[0].upload_date.strftime('%Y-%m-%d') if user_uploads else 'Today'}
+💾 **Total Size:** {format_file_size(total_size or 0)}
+📅 **Member Since:** {first_upload.strftime('%Y-%m-%d') if first_upload else 'Today'}
 
 **Recent Uploads:**
 """
 
-                # Show last 5 uploads
-                recent_uploads = sorted(user_uploads, key=lambda x: x.upload_date, reverse=True)[:5]
-                for upload in recent_uploads:
-                    stats_text += f"• {upload.file_name} ({format_file_size(upload.file_size)})\n"
+            for file_name, file_size in recent_uploads:
+                stats_text += f"• {file_name} ({format_file_size(file_size)})\n"
 
-                if not recent_uploads:
-                    stats_text += "No uploads yet."
+            if not recent_uploads:
+                stats_text += "No uploads yet."
 
-                await message.reply_text(stats_text)
+            await message.reply_text(stats_text)
 
-        except Exception as e:
-            logger.error(f"Error in stats command: {e}")
-            await message.reply_text("❌ An error occurred while fetching statistics.")
-
-    async def admin_command(self, client: Client, message: Message):
+    @safe_handler("❌ An error occurred.")
+    async def admin_command(self, client: Client, message: types.Message):
         """Handle /admin command"""
-        try:
-            if not await self.auth_manager.is_admin(message.from_user.id):
-                await message.reply_text("❌ You don't have admin permissions.")
-                return
-
-            keyboard = InlineKeyboardMarkup([
-                [InlineKeyboardButton("👥 User Management", callback_data="admin_users")],
-                [InlineKeyboardButton("📊 Global Stats", callback_data="admin_stats")],
-                [InlineKeyboardButton("⚙️ Settings", callback_data="admin_settings")],
-                [InlineKeyboardButton("🔄 Refresh", callback_data="admin_refresh")]
-            ])
-
-            admin_text = f"""
-🔧 **{settings.BOT_NAME} - Admin Panel**
-*by @medusaXD*
-
-Welcome, {get_user_info(message.from_user)}!
-
-Use the buttons below to manage the bot:
-"""
-
-            await message.reply_text(admin_text, reply_markup=keyboard)
+        flags = await self.register_user(message.from_user, message.chat.id)
+        if not flags.is_admin:
+            await message.reply_text("❌ You don't have admin permissions.")
+            return
 
-        except Exception as e:
-            logger.error(f"Error in admin command: {e}")
-            await message.reply_text("❌ An error occurred.")
+        await message.reply_text(
+            ADMIN_PANEL_TEXT.format(user=get_user_info(message.from_user)),
+            reply_markup=ADMIN_KEYBOARD
+        )
 
-    async def handle_callback(self, client: Client, callback_query: CallbackQuery):
+    @safe_handler("❌ An error occurred.")
+    async def handle_callback(self, client: Client, callback_query: types.CallbackQuery):
         """Handle callback queries from inline keyboards"""
-        try:
-            data = callback_query.data
-
-            if data == "help":
-                await self.help_command(client, callback_query.message)
-            elif data == "stats":
-                await self.stats_command(client, callback_query.message)
-            elif data == "user_stats":
-                await self.stats_command(client, callback_query.message)
-            elif data.startswith("admin_"):
-                await self.handle_admin_callback(client, callback_query)
-            elif data.startswith("torrent_info_"):
-                await self.handle_torrent_info_callback(client, callback_query)
+        data = callback_query.data
 
-            await callback_query.answer()
+        if data == "help":
+            await self.help_command(client, callback_query.message)
+        elif data == "stats":
+            await self.stats_command(client, callback_query.message)
+        elif data == "user_stats":
+            await self.stats_command(client, callback_query.message)
+        elif data.startswith("admin_"):
+            await self.handle_admin_callback(client, callback_query)
+        elif data.startswith("torrent_info_"):
+            await self.handle_torrent_info_callback(client, callback_query)
 
-        except Exception as e:
-            logger.error(f"Error handling callback: {e}")
-            await callback_query.answer("❌ An error occurred.")
+        await callback_query.answer()
 
-    async def handle_admin_callback(self, client: Client, callback_query: CallbackQuery):
+    async def handle_admin_callback(self, client: Client, callback_query: types.CallbackQuery):
         """Handle admin-specific callbacks"""
         if not await self.auth_manager.is_admin(callback_query.from_user.id):
             await callback_query.answer("❌ Access denied.")
@@ -378,19 +409,18 @@ Use the buttons below to manage the bot:
         elif data == "admin_refresh":
             await self.admin_command(client, callback_query.message)
 
-    async def handle_torrent_info_callback(self, client: Client, callback_query: CallbackQuery):
+    @safe_handler("❌ Error loading torrent info.")
+    async def handle_torrent_info_callback(self, client: Client, callback_query: types.CallbackQuery):
         """Handle torrent info callbacks"""
-        try:
-            message_id = int(callback_query.data.split("_")[-1])
+        message_id = int(callback_query.data.split("_")[-1])
 
-            async with db_manager.get_session() as session:
-                result = await session.execute(
-                    select(TorrentUpload).where(TorrentUpload.message_id == message_id)
-                )
-                upload = result.scalar_one_or_none()
+        async with db_manager.session_scope() as session:
+            result = await session.execute(_SEL_UPLOAD_BY_MESSAGE, {"mid": message_id})
+            upload = result.first()
 
-                if upload:
-                    info_text = f"""
+            if upload:
+                torrent_info = _load_torrent_info(upload.torrent_info)
+                info_text = f"""
 📋 **Detailed Torrent Information**
 
 📁 **File:** `{upload.file_name}`
@@ -399,100 +429,51 @@ Use the buttons below to manage the bot:
 💾 **Size:** {format_file_size(upload.file_size)}
 
 **Torrent Metadata:**
-{upload.torrent_info}
+🏷 **Name:** {torrent_info.get('name', 'N/A')}
+🔗 **Info Hash:** `{torrent_info.get('info_hash', 'N/A')}`
+📊 **Files:** {torrent_info.get('file_count', 'N/A')}
+💾 **Total Size:** {format_file_size(torrent_info.get('total_size', 0))}
 """
-                else:
-                    info_text = "❌ Torrent information not found."
+            else:
+                info_text = "❌ Torrent information not found."
 
-                await callback_query.message.reply_text(info_text)
+            await callback_query.message.reply_text(info_text)
 
-        except Exception as e:
-            logger.error(f"Error showing torrent info: {e}")
-            await callback_query.answer("❌ Error loading torrent info.")
-
-    async def show_global_stats(self, client: Client, callback_query: CallbackQuery):
+    @safe_handler("❌ Error loading statistics.")
+    async def show_global_stats(self, client: Client, callback_query: types.CallbackQuery):
         """Show global statistics for admins"""
-        try:
-            async with db_manager.get_session() as session:
-                # Get total uploads
-                uploads_result = await session.execute(select(TorrentUpload))
-                all_uploads = uploads_result.scalars().all()
-
-                # Get total users
-                users_result = await session.execute(select(User))
-                all_users = users_result.scalars().all()
+        async with db_manager.session_scope() as session:
+            # Upload and user totals
+            active_cutoff = datetime.utcnow() - timedelta(days=7)
+            totals_result = await session.execute(
+                _SEL_GLOBAL_TOTALS, {"cutoff": active_cutoff}
+            )
+            total_uploads, total_size, total_users, active_users = totals_result.one()
 
-                total_uploads = len(all_uploads)
-                total_size = sum(upload.file_size for upload in all_uploads)
-                total_users = len(all_users)
-                active_users = len([u for u in all_users if (datetime.utcnow() - u.last_seen).days <= 7])
+            # Top uploaders
+            top_result = await session.execute(_SEL_TOP_UPLOADERS)
+            top_uploaders = top_result.all()
 
-                stats_text = f"""
+            stats_text = f"""
 📊 **Global Statistics**
 
 👥 **Total Users:** {total_users}
 🟢 **Active Users (7d):** {active_users}
 📁 **Total Uploads:** {total_uploads}
-💾 **Total Data:** {format_file_size(total_size)}
+💾 **Total Data:** {format_file_size(total_size or 0)}
 
 **Top Uploaders:**
 """
 
-                # Get top uploaders
-                user_upload_counts = {}
-                for upload in all_uploads:
-                    user_upload_counts[upload.user_id] = user_upload_counts.get(upload.user_id, 0) + 1
+            for user_id, count in top_uploaders:
+                stats_text += f"• User {user_id}: {count} uploads\n"
 
-                top_uploaders = sorted(user_upload_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-                for user_id, count in top_uploaders:
-                    stats_text += f"• User {user_id}: {count} uploads\n"
+            await callback_query.message.reply_text(stats_text)
 
-                await callback_query.message.reply_text(stats_text)
-
-        except Exception as e:
-            logger.error(f"Error showing global stats: {e}")
-            await callback_query.answer("❌ Error loading statistics.")
-
-    async def show_user_management(self, client: Client, callback_query: CallbackQuery):
+    async def show_user_management(self, client: Client, callback_query: types.CallbackQuery):
         """Show user management panel"""
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("🚫 Ban User", callback_data="admin_ban_user")],
-            [InlineKeyboardButton("✅ Unban User", callback_data="admin_unban_user")],
-            [InlineKeyboardButton("👑 Promote Admin", callback_data="admin_promote")],
-            [InlineKeyboardButton("👤 User Info", callback_data="admin_user_info")],
-            [InlineKeyboardButton("🔙 Back", callback_data="admin_refresh")]
-        ])
-
-        text = """
-👥 **User Management**
+        await callback_query.message.edit_text(USER_MANAGEMENT_TEXT, reply_markup=USER_MANAGEMENT_KEYBOARD)
 
-Select an action:
-• Ban/Unban users
-• Promote to admin
-• View user information
-
-Send user ID after selecting action.
-"""
-
-        await callback_query.message.edit_text(text, reply_markup=keyboard)
-
-    async def show_admin_settings(self, client: Client, callback_query: CallbackQuery):
+    async def show_admin_settings(self, client: Client, callback_query: types.CallbackQuery):
         """Show admin settings panel"""
-        settings_text = f"""
-⚙️ **Bot Settings**
-
-**Current Configuration:**
-• Max File Size: {settings.MAX_FILE_SIZE}MB
-• Allowed Extensions: {', '.join(settings.ALLOWED_TORRENT_EXTENSIONS)}
-• Workers: {settings.WORKERS}
-• Log Level: {settings.LOG_LEVEL}
-
-**Database:** {settings.DATABASE_URL.split('://')[0]}
-**Admins:** {len(settings.ADMIN_USER_IDS)} configured
-"""
-
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("🔙 Back", callback_data="admin_refresh")]
-        ])
-
-        await callback_query.message.edit_text(settings_text, reply_markup=keyboard)
+        await callback_query.message.edit_text(ADMIN_SETTINGS_TEXT, reply_markup=BACK_TO_ADMIN_KEYBOARD)
@@ -0,0 +1,136 @@
+"""Static bot messages and keyboards, rendered once at import"""
+
+from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from config import settings
+
+
+WELCOME_TEXT = f"""
+🐍 **Welcome to {settings.BOT_NAME}!**
+*by @medusaXD*
+
+I'm a powerful torrent downloader bot that helps you manage and share torrent files with advanced features.
+
+**🔥 Features:**
+• Upload and validate torrent files
+• Support for both private chats and groups
+• Admin authentication system
+• File size validation up to 2GB
+• Torrent metadata extraction
+• Multi-user concurrent support
+
+**📋 Commands:**
+/help - Show detailed help
+/stats - View upload statistics
+/admin - Admin panel (admins only)
+
+**🚀 Usage:**
+Simply send me a .torrent file and I'll process it for you!
+
+**✅ Supported in:**
+• Private chats
+• Groups and supergroups
+• Multi-user environments
+"""
+
+WELCOME_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📚 Help", callback_data="help")],
+    [InlineKeyboardButton("📊 Stats", callback_data="stats")]
+])
+
+HELP_TEXT = f"""
+📚 **{settings.BOT_NAME} Help**
+*by @medusaXD*
+
+**🚀 Basic Usage:**
+1. Send me a .torrent file
+2. I'll validate and process it
+3. Get detailed torrent information
+
+**📋 Commands:**
+/start - Start the bot
+/help - Show this help message
+/stats - View your upload statistics
+/admin - Admin panel (admins only)
+
+**📁 File Requirements:**
+• File type: .torrent only
+• Max size: {settings.MAX_FILE_SIZE}MB (2GB)
+• Must be a valid torrent file
+
+**👑 Admin Features:**
+• User management
+• Ban/unban users
+• View all statistics
+• Chat settings management
+
+**🌐 Multi-Platform Support:**
+This bot works in both private chats and groups!
+Perfect for torrent communities and individual users.
+
+**🔥 Powered by MedusaXD**
+"""
+
+# Formatted per request with the admin's display name, so braces in
+# BOT_NAME are escaped to survive str.format
+_FORMAT_SAFE_BOT_NAME = settings.BOT_NAME.replace("{", "{{").replace("}", "}}")
+
+ADMIN_PANEL_TEXT = f"""
+🔧 **{_FORMAT_SAFE_BOT_NAME} - Admin Panel**
+*by @medusaXD*
+
+Welcome, {{user}}!
+
+Use the buttons below to manage the bot:
+"""
+
+ADMIN_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("👥 User Management", callback_data="admin_users")],
+    [InlineKeyboardButton("📊 Global Stats", callback_data="admin_stats")],
+    [InlineKeyboardButton("⚙️ Settings", callback_data="admin_settings")],
+    [InlineKeyboardButton("🔄 Refresh", callback_data="admin_refresh")]
+])
+
+USER_MANAGEMENT_TEXT = """
+👥 **User Management**
+
+Select an action:
+• Ban/Unban users
+• Promote to admin
+• View user information
+
+Send user ID after selecting action.
+"""
+
+USER_MANAGEMENT_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🚫 Ban User", callback_data="admin_ban_user")],
+    [InlineKeyboardButton("✅ Unban User", callback_data="admin_unban_user")],
+    [InlineKeyboardButton("👑 Promote Admin", callback_data="admin_promote")],
+    [InlineKeyboardButton("👤 User Info", callback_data="admin_user_info")],
+    [InlineKeyboardButton("🔙 Back", callback_data="admin_refresh")]
+])
+
+ADMIN_SETTINGS_TEXT = f"""
+⚙️ **Bot Settings**
+
+**Current Configuration:**
+• Max File Size: {settings.MAX_FILE_SIZE}MB
+• Allowed Extensions: {', '.join(settings.ALLOWED_TORRENT_EXTENSIONS)}
+• Workers: {settings.WORKERS}
+• Log Level: {settings.LOG_LEVEL}
+
+**Database:** {settings.DATABASE_URL.split('://')[0]}
+**Admins:** {len(settings.ADMIN_USER_IDS)} configured
+"""
+
+BACK_TO_ADMIN_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔙 Back", callback_data="admin_refresh")]
+])
+
+# Upload rejection messages
+INVALID_FILE_TYPE_TEXT = (
+    f"❌ Invalid file type. Only {', '.join(settings.ALLOWED_TORRENT_EXTENSIONS)} files are allowed."
+)
+FILE_TOO_LARGE_TEXT = (
+    f"❌ File too large. Maximum size is {settings.MAX_FILE_SIZE}MB. "
+    "Your file is {size}."
+)
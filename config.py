@@ -1,5 +1,6 @@
 import os
-from typing import List, Optional
+from functools import cached_property
+from typing import FrozenSet, List, Optional, Tuple
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
 from dotenv import load_dotenv
@@ -14,11 +15,15 @@ class Settings(BaseSettings):
     BOT_TOKEN: str
     
     # Admin Configuration
-    ADMIN_USER_IDS: List[int] = []
+    ADMIN_USER_IDS: FrozenSet[int] = frozenset()
     SUPER_ADMIN_ID: int
     
     # Database Configuration
-    DATABASE_URL: str = "sqlite:///bot.db"
+    DATABASE_URL: str = "sqlite+aiosqlite:///bot.db"
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 30
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # seconds
     
     # Bot Configuration
     BOT_NAME: str = "MedusaXD Torrent Downloader"
@@ -26,6 +31,11 @@ class Settings(BaseSettings):
     ALLOWED_TORRENT_EXTENSIONS: List[str] = [".torrent"]
     LOG_LEVEL: str = "INFO"
     
+    # Auth Cache Configuration
+    AUTH_CACHE_SIZE: int = 100_000
+    AUTH_CACHE_TTL: int = 3 * 3600  # seconds
+    REDIS_URL: Optional[str] = None  # enables cross-worker cache invalidation
+    
     # Session Configuration
     SESSION_NAME: str = "medusaxd_bot_session"
     WORKERS: int = 4
@@ -37,9 +47,22 @@ class Settings(BaseSettings):
     @classmethod
     def parse_admin_user_ids(cls, v):
         if isinstance(v, str):
-            return [int(x.strip()) for x in v.split(',') if x.strip()]
+            return frozenset(int(x.strip()) for x in v.split(',') if x.strip())
         elif isinstance(v, int):
-            return [v]  # Convert single int to list
+            return frozenset([v])  # Convert single int to set
+        return v
+    
+    @field_validator('DATABASE_URL')
+    @classmethod
+    def use_async_driver(cls, v):
+        # Bare URLs would select a sync driver and block the event loop
+        for prefix, async_prefix in (
+            ("sqlite://", "sqlite+aiosqlite://"),
+            ("postgresql://", "postgresql+asyncpg://"),
+            ("postgres://", "postgresql+asyncpg://"),
+        ):
+            if v.startswith(prefix):
+                return async_prefix + v[len(prefix):]
         return v
     
     @field_validator('ALLOWED_TORRENT_EXTENSIONS', mode='before')
@@ -49,6 +72,16 @@ class Settings(BaseSettings):
             return [x.strip() for x in v.split(',') if x.strip()]
         return v
     
+    @cached_property
+    def allowed_ext_tuple(self) -> Tuple[str, ...]:
+        """Lowercased allowed extensions, usable directly with str.endswith"""
+        return tuple(ext.lower() for ext in self.ALLOWED_TORRENT_EXTENSIONS)
+    
+    @cached_property
+    def max_file_size_bytes(self) -> int:
+        """MAX_FILE_SIZE converted from MB to bytes"""
+        return self.MAX_FILE_SIZE * 1024 * 1024
+    
     model_config = {"env_file": ".env", "case_sensitive": True}
 
 
@@ -57,4 +90,4 @@ settings = Settings()
 
 # Ensure super admin is in admin list
 if settings.SUPER_ADMIN_ID not in settings.ADMIN_USER_IDS:
-    settings.ADMIN_USER_IDS.append(settings.SUPER_ADMIN_ID)
+    settings.ADMIN_USER_IDS = settings.ADMIN_USER_IDS | {settings.SUPER_ADMIN_ID}
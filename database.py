@@ -1,10 +1,14 @@
 import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional, List
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, BigInteger
+from typing import AsyncIterator, Optional, List
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, BigInteger, Index, JSON, event, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from config import settings
 import logging
 
@@ -24,6 +28,16 @@ class User(Base):
     is_banned = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     last_seen = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # Partial indexes for the admin / banned listings
+        Index("ix_user_admin", "id",
+              postgresql_where=text("is_admin"), sqlite_where=text("is_admin = 1")),
+        Index("ix_user_banned", "id",
+              postgresql_where=text("is_banned"), sqlite_where=text("is_banned = 1")),
+        # Active-user count in global stats
+        Index("ix_user_last_seen", "last_seen"),
+    )
 
 
 class TorrentUpload(Base):
@@ -38,7 +52,14 @@ class TorrentUpload(Base):
     message_id = Column(Integer, nullable=False)
     upload_date = Column(DateTime, default=datetime.utcnow)
     is_valid = Column(Boolean, default=True)
-    torrent_info = Column(Text, nullable=True)  # JSON string with torrent metadata
+    torrent_info = Column(JSON().with_variant(JSONB, "postgresql"), nullable=True)  # Torrent metadata (JSONB on PostgreSQL)
+    
+    __table_args__ = (
+        # Per-user stats and recent uploads
+        Index("ix_torrent_user_date", "user_id", "upload_date"),
+        # Torrent info callback lookup
+        Index("ix_torrent_message", "message_id"),
+    )
 
 
 class ChatSettings(Base):
@@ -53,6 +74,24 @@ class ChatSettings(Base):
     updated_at = Column(DateTime, default=datetime.utcnow)
 
 
+def _connect_args(database_url: str) -> dict:
+    """Driver-specific connection arguments"""
+    if database_url.startswith("postgresql+asyncpg"):
+        # Let asyncpg keep more prepared statements per connection for the hot queries
+        return {"statement_cache_size": 1000}
+    return {}
+
+
+def _set_sqlite_pragmas(dbapi_conn, _connection_record):
+    """WAL journal with relaxed fsync; one row per upload doesn't need FULL sync"""
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+
 class DatabaseManager:
     def __init__(self):
         self.database_url = settings.DATABASE_URL
@@ -62,14 +101,21 @@ class DatabaseManager:
     async def init_db(self):
         """Initialize database connection and create tables"""
         try:
+            # DATABASE_URL is already normalized to an async driver by Settings;
+            # size the pool for concurrent handlers (pool_size + max_overflow >= WORKERS)
+            self.engine = create_async_engine(
+                self.database_url,
+                echo=False,
+                poolclass=AsyncAdaptedQueuePool,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_pre_ping=settings.DB_POOL_PRE_PING,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+                connect_args=_connect_args(self.database_url)
+            )
+            
             if self.database_url.startswith("sqlite"):
-                # For SQLite
-                self.database_url = self.database_url.replace("sqlite://", "sqlite+aiosqlite://")
-                self.engine = create_async_engine(self.database_url, echo=False)
-            else:
-                # For PostgreSQL
-                self.database_url = self.database_url.replace("postgresql://", "postgresql+asyncpg://")
-                self.engine = create_async_engine(self.database_url, echo=False)
+                event.listen(self.engine.sync_engine, "connect", _set_sqlite_pragmas)
             
             self.session_factory = async_sessionmaker(
                 bind=self.engine,
@@ -87,6 +133,20 @@ class DatabaseManager:
             logger.error(f"Failed to initialize database: {e}")
             raise
     
+    def insert(self, model):
+        """Dialect-specific INSERT supporting ON CONFLICT ... DO UPDATE"""
+        if self.engine is not None and self.engine.dialect.name == "postgresql":
+            return postgresql.insert(model)
+        return sqlite.insert(model)
+    
+    @asynccontextmanager
+    async def session_scope(self) -> AsyncIterator[AsyncSession]:
+        """Provide a pooled session for one unit of work"""
+        if not self.session_factory:
+            await self.init_db()
+        async with self.session_factory() as session:
+            yield session
+    
     async def get_session(self) -> AsyncSession:
         """Get database session"""
         if not self.session_factory:
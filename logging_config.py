@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import sys
 from datetime import datetime
@@ -27,6 +28,11 @@ class InterceptHandler(logging.Handler):
         )
 
 
+def _audit_filter(record) -> bool:
+    """Select records logged through utils' audit logger"""
+    return record["extra"].get("audit", False)
+
+
 def setup_logging():
     """Setup logging configuration"""
     
@@ -50,7 +56,10 @@ def setup_logging():
         diagnose=True
     )
     
-    # File handler for all logs
+    # File handlers use enqueue=True so writes happen on loguru's background
+    # worker instead of blocking the event loop on disk I/O
+    
+    # File handler for all logs (block-buffered; flushed on rotation/shutdown)
     logger.add(
         logs_dir / "bot.log",
         level="DEBUG",
@@ -59,7 +68,9 @@ def setup_logging():
         retention="30 days",
         compression="zip",
         backtrace=True,
-        diagnose=True
+        diagnose=True,
+        enqueue=True,
+        buffering=65536
     )
     
     # Error file handler
@@ -71,7 +82,8 @@ def setup_logging():
         retention="60 days",
         compression="zip",
         backtrace=True,
-        diagnose=True
+        diagnose=True,
+        enqueue=True
     )
     
     # User actions log
@@ -79,10 +91,11 @@ def setup_logging():
         logs_dir / "user_actions.log",
         level="INFO",
         format="{time:YYYY-MM-DD HH:mm:ss} | {message}",
-        filter=lambda record: "User action:" in record["message"],
+        filter=_audit_filter,
         rotation="5 MB",
         retention="90 days",
-        compression="zip"
+        compression="zip",
+        enqueue=True
     )
     
     # Intercept standard logging
@@ -98,22 +111,29 @@ def setup_logging():
 
 def log_startup_info():
     """Log startup information"""
-    logger.info("=" * 50)
-    logger.info(f"Starting {settings.BOT_NAME}")
-    logger.info(f"Log Level: {settings.LOG_LEVEL}")
-    logger.info(f"Workers: {settings.WORKERS}")
-    logger.info(f"Max File Size: {settings.MAX_FILE_SIZE}MB")
-    logger.info(f"Database: {settings.DATABASE_URL.split('://')[0]}")
-    logger.info(f"Admins configured: {len(settings.ADMIN_USER_IDS)}")
-    logger.info("=" * 50)
+    rule = "=" * 50
+    db_scheme = settings.DATABASE_URL.split('://', 1)[0]
+    logger.info(
+        f"{rule}\n"
+        f"Starting {settings.BOT_NAME}\n"
+        f"Log Level: {settings.LOG_LEVEL}\n"
+        f"Workers: {settings.WORKERS}\n"
+        f"Max File Size: {settings.MAX_FILE_SIZE}MB\n"
+        f"Database: {db_scheme}\n"
+        f"Admins configured: {len(settings.ADMIN_USER_IDS)}\n"
+        f"{rule}"
+    )
 
 
 def log_shutdown_info():
     """Log shutdown information"""
-    logger.info("=" * 50)
-    logger.info(f"{settings.BOT_NAME} shutting down")
-    logger.info(f"Shutdown time: {datetime.utcnow()}")
-    logger.info("=" * 50)
+    rule = "=" * 50
+    logger.info(
+        f"{rule}\n"
+        f"{settings.BOT_NAME} shutting down\n"
+        f"Shutdown time: {datetime.utcnow()}\n"
+        f"{rule}"
+    )
 
 
 class BotMetrics:
@@ -128,11 +148,9 @@ class BotMetrics:
     
     def increment_uploads(self):
         self.total_uploads += 1
-        logger.info(f"Total uploads: {self.total_uploads}")
     
     def increment_users(self):
         self.total_users += 1
-        logger.info(f"Total users: {self.total_users}")
     
     def log_error(self, error: str):
         self.errors_count += 1
@@ -142,6 +160,16 @@ class BotMetrics:
     def get_uptime(self):
         return datetime.utcnow() - self.start_time
     
+    async def periodic_flush(self, interval: int = 30):
+        """Log aggregated metrics every `interval` seconds, if any counter changed"""
+        last = (self.total_uploads, self.total_users, self.errors_count)
+        while True:
+            await asyncio.sleep(interval)
+            current = (self.total_uploads, self.total_users, self.errors_count)
+            if current != last:
+                self.log_metrics()
+                last = current
+    
     def log_metrics(self):
         uptime = self.get_uptime()
         logger.info(f"Bot Metrics - Uptime: {uptime}, Uploads: {self.total_uploads}, "
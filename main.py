@@ -23,6 +23,7 @@ class BotManager:
     
     def __init__(self):
         self.bot = None
+        self.metrics_task = None
         self.shutdown_event = asyncio.Event()
     
     async def start(self):
@@ -32,6 +33,9 @@ class BotManager:
             setup_logging()
             log_startup_info()
             
+            # Emit aggregated metrics periodically instead of per event
+            self.metrics_task = asyncio.create_task(metrics.periodic_flush())
+            
             # Create and start bot
             self.bot = TorrentBot()
             
@@ -65,6 +69,9 @@ class BotManager:
         try:
             log_shutdown_info()
             
+            if self.metrics_task:
+                self.metrics_task.cancel()
+            
             if self.bot:
                 logger.info("Stopping bot...")
                 await self.bot.stop()
@@ -74,6 +81,9 @@ class BotManager:
             
             logger.info("Shutdown complete")
             
+            # Drain queued file log records
+            await logger.complete()
+            
         except Exception as e:
             logger.error(f"Error during shutdown: {e}")
 
@@ -13,7 +13,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from config import settings
 from database import db_manager
-from utils import TorrentValidator, format_file_size
+from utils import TorrentValidator, format_file_size, _find_info_span
 from auth import AuthManager
 import logging
 
@@ -59,7 +59,7 @@ async def test_database():
         print("✅ Database connection successful")
         
         # Test session
-        async with db_manager.get_session() as session:
+        async with db_manager.session_scope() as session:
             print("✅ Database session created")
         
         print("✅ Database tests passed")
@@ -109,6 +109,12 @@ async def test_torrent_validator():
         size_str = format_file_size(1024 * 1024 * 50)  # 50MB
         print(f"✅ File size formatting: {size_str}")
         
+        # Malformed length prefixes must be rejected, not loop forever
+        assert _find_info_span(b'd-3:abcde') is None, "Negative length accepted"
+        result = await asyncio.wait_for(validator.validate_bytes(b'd-3:abcde'), timeout=5)
+        assert not result.is_valid, "Malformed torrent accepted"
+        print("✅ Malformed torrent rejected")
+        
         print("✅ Torrent validator tests passed")
         return True
         
@@ -162,16 +168,33 @@ async def run_all_tests():
         ("Authentication", test_auth_manager),
         ("Torrent Validator", test_torrent_validator),
     ]
+    # These share no state and don't touch the database, so run them together
+    independent = {"Configuration", "Imports", "Torrent Validator"}
     
-    results = []
+    outcomes = {}
+    
+    concurrent = [(name, func) for name, func in tests if name in independent]
+    gathered = await asyncio.gather(*(func() for _, func in concurrent), return_exceptions=True)
+    for (test_name, _), result in zip(concurrent, gathered):
+        outcomes[test_name] = result
     
+    # Database-dependent tests run one after another
     for test_name, test_func in tests:
+        if test_name in independent:
+            continue
         try:
-            result = await test_func()
-            results.append((test_name, result))
+            outcomes[test_name] = await test_func()
         except Exception as e:
-            print(f"❌ {test_name} test crashed: {e}")
-            results.append((test_name, False))
+            outcomes[test_name] = e
+    
+    results = []
+    
+    for test_name, _ in tests:
+        result = outcomes[test_name]
+        if isinstance(result, BaseException):
+            print(f"❌ {test_name} test crashed: {result}")
+            result = False
+        results.append((test_name, result))
     
     # Summary
     print("\n" + "=" * 50)
@@ -1,15 +1,154 @@
+import asyncio
 import os
 import hashlib
-import json
-import bencodepy
-from datetime import datetime
-from typing import Dict, Any, Optional, NamedTuple
+import multiprocessing
+import re
+from collections import OrderedDict
+from bencodepy import decode as _lenient_bdecode, encode as _bencode
+try:
+    # C-accelerated decoder; same dict[bytes, Any] shapes as bencodepy
+    from fastbencode import bdecode as _fast_bdecode, bencode as _fast_bencode
+except ImportError:
+    _fast_bdecode = _fast_bencode = None
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional, NamedTuple, Tuple, Union, BinaryIO
 from pyrogram.types import User
 from config import settings
+from loguru import logger as loguru_logger
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Records from this logger are routed to user_actions.log (see logging_config)
+_audit_logger = loguru_logger.bind(audit=True)
+
+
+def _bdecode(data: bytes) -> Tuple[Any, bool]:
+    """Decode bencode, preferring fastbencode; returns (value, is_canonical).
+    
+    fastbencode rejects dicts with unsorted keys, which bencodepy (and many
+    real-world torrents) accept, so such input is retried with bencodepy.
+    Input fastbencode accepts is canonical: re-encoding reproduces it exactly.
+    """
+    if _fast_bdecode is not None:
+        try:
+            return _fast_bdecode(data), True
+        except ValueError:
+            pass
+    return _lenient_bdecode(data), False
+
+
+# Torrents larger than this are validated in a worker process instead of a thread.
+# The payload is pickled into the worker, so it is briefly held twice in memory.
+_PROCESS_POOL_THRESHOLD = 100 * 1024 * 1024
+_cpu_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_cpu_pool() -> ProcessPoolExecutor:
+    global _cpu_pool
+    if _cpu_pool is None:
+        # Never fork: the bot process runs threads (loguru, executors, pyrogram)
+        # whose held locks would be copied into the child
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _cpu_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context(method)
+        )
+    return _cpu_pool
+
+
+def shutdown_cpu_pool():
+    """Shut down the validation process pool, if it was started"""
+    global _cpu_pool
+    if _cpu_pool is not None:
+        _cpu_pool.shutdown(wait=False)
+        _cpu_pool = None
+
+
+# Bencode type markers as byte values
+_B_INT, _B_LIST, _B_DICT, _B_END = b'i'[0], b'l'[0], b'd'[0], b'e'[0]
+
+
+def _skip_bencoded(data: bytes, pos: int) -> int:
+    """Return the offset just past the bencoded value starting at pos"""
+    token = data[pos]
+    if token == _B_INT:
+        return data.index(b'e', pos) + 1
+    if token == _B_LIST or token == _B_DICT:
+        pos += 1
+        while data[pos] != _B_END:
+            pos = _skip_bencoded(data, pos)
+        return pos + 1
+    colon = data.index(b':', pos)
+    length = data[pos:colon]
+    # Only plain digits: a sign would let the cursor move backwards and never end
+    if not length.isdigit():
+        raise ValueError(f"Invalid string length at offset {pos}")
+    return colon + 1 + int(length)
+
+
+def _find_info_span(data: bytes) -> Optional[Tuple[int, int]]:
+    """Locate the raw bencoded 'info' value in a torrent's top-level dict.
+    
+    Walks the structure rather than searching for b'4:info', which could
+    also appear inside string payloads.
+    """
+    try:
+        if data[0] != _B_DICT:
+            return None
+        pos = 1
+        while data[pos] != _B_END:
+            colon = data.index(b':', pos)
+            key_end = _skip_bencoded(data, pos)
+            value_end = _skip_bencoded(data, key_end)
+            if data[colon + 1:key_end] == b'info':
+                return key_end, value_end
+            pos = value_end
+    except (IndexError, ValueError, RecursionError):
+        pass
+    return None
+
+
+# Window size for single-pass hashing; small enough to stay in L2 cache
+_HASH_WINDOW = 64 * 1024
+
+# Window size when hashing a whole file read from disk
+_FILE_HASH_WINDOW = 1024 * 1024
+
+
+def _read_and_hash(file_path: str) -> Tuple[bytes, str]:
+    """Read a file and compute its SHA-256 in 1MB windows (blocking).
+    
+    The file is read into a single bytes object, which is the only copy; the
+    decoders need exact bytes, so a bytearray would have to be copied again.
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    sha256 = hashlib.sha256()
+    with memoryview(data) as view:
+        for start in range(0, len(view), _FILE_HASH_WINDOW):
+            sha256.update(view[start:start + _FILE_HASH_WINDOW])
+    return data, sha256.hexdigest()
+
+
+def _hash_torrent(data: bytes, info_start: int, info_end: int) -> Tuple[str, str]:
+    """SHA-1 of data[info_start:info_end] and SHA-256 of data, in one pass"""
+    view = memoryview(data)
+    sha1, sha256 = hashlib.sha1(), hashlib.sha256()
+    for start in range(0, len(view), _HASH_WINDOW):
+        end = start + _HASH_WINDOW
+        sha256.update(view[start:end])
+        lo, hi = max(start, info_start), min(end, info_end)
+        if lo < hi:
+            sha1.update(view[lo:hi])
+    return sha1.hexdigest(), sha256.hexdigest()
+
+
+# Info-dict keys used while extracting metadata
+_K_NAME, _K_PIECE_LEN, _K_FILES, _K_LENGTH, _K_PATH = b'name', b'piece length', b'files', b'length', b'path'
+
 
 class ValidationResult(NamedTuple):
     is_valid: bool
@@ -17,19 +156,123 @@ class ValidationResult(NamedTuple):
     metadata: Optional[Dict[str, Any]] = None
 
 
+# LRU of validation results for recently seen torrents, keyed by
+# (SHA-256 hex, size); cached results are shared between callers and must be
+# treated as read-only. Metadata grows with the payload, so only small
+# payloads are cached and the total of their sizes is capped as well.
+_RESULT_CACHE_SIZE = 1024
+_RESULT_CACHE_MAX_PAYLOAD = 1024 * 1024
+_RESULT_CACHE_BUDGET = 32 * 1024 * 1024
+_RESULT_CACHE: "OrderedDict[Tuple[str, int], ValidationResult]" = OrderedDict()
+_result_cache_bytes = 0
+
+
+def _sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _remember_result(key: Tuple[str, int], result: "ValidationResult"):
+    """Add a result to the cache, evicting the oldest entries past either limit"""
+    global _result_cache_bytes
+    if key in _RESULT_CACHE:
+        _RESULT_CACHE.move_to_end(key)
+        return
+    _RESULT_CACHE[key] = result
+    _result_cache_bytes += key[1]
+    while len(_RESULT_CACHE) > _RESULT_CACHE_SIZE or _result_cache_bytes > _RESULT_CACHE_BUDGET:
+        (_, size), _ = _RESULT_CACHE.popitem(last=False)
+        _result_cache_bytes -= size
+
+
 class TorrentValidator:
     """Validates and extracts metadata from torrent files"""
     
     async def validate_torrent(self, file_path: str) -> ValidationResult:
-        """Validate a torrent file and extract metadata"""
+        """Validate a torrent file on disk and extract metadata"""
+        try:
+            loop = asyncio.get_running_loop()
+            torrent_data, file_hash = await loop.run_in_executor(None, _read_and_hash, file_path)
+            
+            # Hand the only reference on so the bytes can be freed mid-validation
+            payload = [torrent_data]
+            del torrent_data
+            return await self._validate_payload(payload, file_hash)
+            
+        except Exception as e:
+            logger.error(f"Error validating torrent: {e}")
+            return ValidationResult(False, f"Validation error: {str(e)}")
+        finally:
+            # Clean up temporary file
+            Path(file_path).unlink(missing_ok=True)
+    
+    async def validate_bytes(self, data: Union[bytes, BinaryIO],
+                             file_hash: Optional[str] = None) -> ValidationResult:
+        """Validate torrent contents held in memory and extract metadata.
+        
+        file_hash, if given, is the already computed SHA-256 of the contents.
+        """
+        try:
+            if isinstance(data, (bytes, bytearray)):
+                torrent_data = bytes(data)
+            elif hasattr(data, 'getvalue'):
+                torrent_data = data.getvalue()
+            else:
+                torrent_data = data.read()
+            
+            # Don't pin the bytes here while validation runs
+            payload = [torrent_data]
+            del data, torrent_data
+            return await self._validate_payload(payload, file_hash)
+            
+        except Exception as e:
+            logger.error(f"Error validating torrent: {e}")
+            return ValidationResult(False, f"Validation error: {str(e)}")
+    
+    async def _validate_payload(self, payload: List[bytes], file_hash: Optional[str]) -> ValidationResult:
+        """Validate the single bytes object in payload, consulting the result cache"""
+        loop = asyncio.get_running_loop()
+        size = len(payload[0])
+        
+        # Reposted small torrents skip parsing entirely. The key is the
+        # content SHA-256, computed off the loop unless the disk read did it.
+        key = None
+        if size <= _RESULT_CACHE_MAX_PAYLOAD:
+            if file_hash is None:
+                file_hash = await loop.run_in_executor(None, _sha256_hex, payload[0])
+            key = (file_hash, size)
+            cached = _RESULT_CACHE.get(key)
+            if cached is not None:
+                _RESULT_CACHE.move_to_end(key)
+                return cached
+        
+        # Parsing and hashing are CPU-bound; keep them off the event loop.
+        # Very large payloads go to a process so they don't hold the GIL;
+        # the worker then owns its unpickled copy.
+        executor = _get_cpu_pool() if size > _PROCESS_POOL_THRESHOLD else None
+        result = await loop.run_in_executor(executor, self._validate_owned, payload, file_hash)
+        
+        if key is not None and result.is_valid:
+            _remember_result(key, result)
+        return result
+    
+    def validate_torrent_sync(self, torrent_data: bytes, file_hash: Optional[str] = None) -> ValidationResult:
+        """Parse and hash torrent contents (blocking)"""
+        return self._validate_owned([torrent_data], file_hash)
+    
+    def _validate_owned(self, payload: List[bytes], file_hash: Optional[str]) -> ValidationResult:
+        """Parse and hash the bytes popped from payload (blocking).
+        
+        Taking the bytes out of the list leaves this frame with the last
+        reference (unless a caller kept its own), so they are released before
+        metadata extraction and info-dict re-encoding. Everything that reads
+        the raw bytes (file hash, raw info span) must happen before the del.
+        """
         try:
-            # Read and decode torrent file
-            with open(file_path, 'rb') as f:
-                torrent_data = f.read()
+            torrent_data = payload.pop()
             
             # Parse bencode
             try:
-                decoded = bencodepy.decode(torrent_data)
+                decoded, canonical = _bdecode(torrent_data)
             except Exception as e:
                 return ValidationResult(False, f"Invalid bencode format: {str(e)}")
             
@@ -40,40 +283,47 @@ class TorrentValidator:
             if b'announce' not in decoded:
                 return ValidationResult(False, "Missing 'announce' field")
             
+            # Lenient (non-canonical) input is hashed from its raw info span,
+            # since re-encoding would not reproduce it
+            info_hash = None
+            if not canonical:
+                span = _find_info_span(torrent_data)
+                if span is not None and file_hash is None:
+                    info_hash, file_hash = _hash_torrent(torrent_data, *span)
+                elif span is not None:
+                    info_hash = hashlib.sha1(memoryview(torrent_data)[span[0]:span[1]]).hexdigest()
+            if file_hash is None:
+                file_hash = hashlib.sha256(torrent_data).hexdigest()
+            
+            # Raw bytes are not needed past this point
+            del torrent_data
+            
             info = decoded[b'info']
             
-            # Extract metadata
-            metadata = await self._extract_metadata(decoded, info)
+            # Input fastbencode accepted is canonical, so the C encoder
+            # reproduces the raw info bytes exactly
+            if info_hash is None:
+                info_hash = hashlib.sha1((_fast_bencode if canonical else _bencode)(info)).hexdigest()
             
-            # Calculate info hash
-            info_hash = hashlib.sha1(bencodepy.encode(info)).hexdigest()
+            # Extract metadata
+            metadata = self._extract_metadata(decoded, info)
             metadata['info_hash'] = info_hash
-            
-            # Calculate file hash
-            file_hash = hashlib.sha256(torrent_data).hexdigest()
             metadata['file_hash'] = file_hash
             
-            # Clean up temporary file
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            
             return ValidationResult(True, None, metadata)
             
         except Exception as e:
             logger.error(f"Error validating torrent: {e}")
-            # Clean up temporary file
-            if os.path.exists(file_path):
-                os.remove(file_path)
             return ValidationResult(False, f"Validation error: {str(e)}")
     
-    async def _extract_metadata(self, decoded: dict, info: dict) -> Dict[str, Any]:
+    def _extract_metadata(self, decoded: dict, info: dict) -> Dict[str, Any]:
         """Extract metadata from torrent info"""
         metadata = {}
         
         try:
             # Basic info
-            metadata['name'] = info.get(b'name', b'').decode('utf-8', errors='ignore')
-            metadata['piece_length'] = info.get(b'piece length', 0)
+            metadata['name'] = info.get(_K_NAME, b'').decode('utf-8', errors='ignore')
+            metadata['piece_length'] = info.get(_K_PIECE_LEN, 0)
             
             # Announce URLs
             announce_list = []
@@ -88,26 +338,23 @@ class TorrentValidator:
             metadata['announce_urls'] = announce_list
             
             # Files info
-            if b'files' in info:
-                # Multi-file torrent
-                files = []
-                total_size = 0
-                for file_info in info[b'files']:
-                    file_size = file_info.get(b'length', 0)
-                    file_path = '/'.join([p.decode('utf-8', errors='ignore') for p in file_info.get(b'path', [])])
-                    files.append({
-                        'path': file_path,
-                        'size': file_size
-                    })
-                    total_size += file_size
+            if _K_FILES in info:
+                # Multi-file torrent; join path segments as bytes and decode once per file
+                files = [
+                    {
+                        'path': b'/'.join(file_info.get(_K_PATH, [])).decode('utf-8', errors='ignore'),
+                        'size': file_info.get(_K_LENGTH, 0)
+                    }
+                    for file_info in info[_K_FILES]
+                ]
                 
                 metadata['files'] = files
                 metadata['file_count'] = len(files)
-                metadata['total_size'] = total_size
+                metadata['total_size'] = sum(f['size'] for f in files)
                 metadata['is_single_file'] = False
             else:
                 # Single file torrent
-                file_size = info.get(b'length', 0)
+                file_size = info.get(_K_LENGTH, 0)
                 metadata['files'] = [{
                     'path': metadata['name'],
                     'size': file_size
@@ -135,18 +382,22 @@ class TorrentValidator:
             return {'error': str(e)}
 
 
+_SIZE_NAMES = ("B", "KB", "MB", "GB", "TB")
+
+
 def format_file_size(size_bytes: int) -> str:
     """Format file size in human readable format"""
     if size_bytes == 0:
         return "0 B"
     
-    size_names = ["B", "KB", "MB", "GB", "TB"]
-    i = 0
-    while size_bytes >= 1024 and i < len(size_names) - 1:
-        size_bytes /= 1024.0
-        i += 1
+    # Negative sizes never scaled under the old division loop
+    if size_bytes < 0:
+        return f"{size_bytes:.2f} B"
     
-    return f"{size_bytes:.2f} {size_names[i]}"
+    # Unit index straight from the bit length: every 10 bits is one 1024 step
+    # (clamped at 0 so fractional sizes below 1 stay in bytes)
+    i = max(0, min((int(size_bytes).bit_length() - 1) // 10, len(_SIZE_NAMES) - 1))
+    return f"{size_bytes / (1 << (10 * i)):.2f} {_SIZE_NAMES[i]}"
 
 
 def get_user_info(user: User) -> str:
@@ -161,22 +412,36 @@ def get_user_info(user: User) -> str:
         return f"User {user.id}"
 
 
+# Admin ids hoisted out of settings for single-lookup membership checks
+_ADMIN_SET = frozenset(settings.ADMIN_USER_IDS)
+_SUPER_ADMIN = settings.SUPER_ADMIN_ID
+
+
+def refresh_admin_cache():
+    """Re-read admin ids from settings after they change"""
+    global _ADMIN_SET, _SUPER_ADMIN
+    _ADMIN_SET = frozenset(settings.ADMIN_USER_IDS)
+    _SUPER_ADMIN = settings.SUPER_ADMIN_ID
+
+
 def is_admin(user_id: int) -> bool:
     """Check if user is admin"""
-    return user_id in settings.ADMIN_USER_IDS
+    return user_id in _ADMIN_SET
 
 
 def is_super_admin(user_id: int) -> bool:
     """Check if user is super admin"""
-    return user_id == settings.SUPER_ADMIN_ID
+    return user_id == _SUPER_ADMIN
+
+
+# Dangerous filename characters mapped to '_'
+_SANITIZE_TABLE = str.maketrans({c: '_' for c in '/\\:*?"<>|'})
 
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe storage"""
-    # Remove or replace dangerous characters
-    dangerous_chars = ['/', '\\', ':', '*', '?', '"', '<', '>', '|']
-    for char in dangerous_chars:
-        filename = filename.replace(char, '_')
+    # Replace dangerous characters in a single pass
+    filename = filename.translate(_SANITIZE_TABLE)
     
     # Limit length
     if len(filename) > 255:
@@ -186,29 +451,34 @@ def sanitize_filename(filename: str) -> str:
     return filename
 
 
+# Potentially dangerous content in user input, matched case-insensitively in one scan
+_DANGEROUS_INPUT_RE = re.compile(r'<script|javascript:|data:|vbscript:', re.IGNORECASE)
+
+
 def validate_user_input(text: str, max_length: int = 1000) -> bool:
     """Validate user input for safety"""
     if not text or len(text) > max_length:
         return False
     
     # Check for potentially dangerous content
-    dangerous_patterns = ['<script', 'javascript:', 'data:', 'vbscript:']
-    text_lower = text.lower()
-    
-    for pattern in dangerous_patterns:
-        if pattern in text_lower:
-            return False
-    
-    return True
+    return _DANGEROUS_INPUT_RE.search(text) is None
+
 
+# Every bar of the default length, indexed by filled cells
+_BAR_LEN = 20
+_BARS = tuple("█" * i + "░" * (_BAR_LEN - i) for i in range(_BAR_LEN + 1))
 
-def create_progress_bar(current: int, total: int, length: int = 20) -> str:
+
+def create_progress_bar(current: int, total: int, length: int = _BAR_LEN) -> str:
     """Create a progress bar string"""
     if total == 0:
-        return "█" * length
+        return _BARS[_BAR_LEN] if length == _BAR_LEN else "█" * length
     
     filled = int(length * current / total)
-    bar = "█" * filled + "░" * (length - filled)
+    if length == _BAR_LEN and 0 <= filled <= _BAR_LEN:
+        bar = _BARS[filled]
+    else:
+        bar = "█" * filled + "░" * (length - filled)
     percentage = (current / total) * 100
     
     return f"{bar} {percentage:.1f}%"
@@ -216,14 +486,10 @@ def create_progress_bar(current: int, total: int, length: int = 20) -> str:
 
 async def log_user_action(user_id: int, action: str, details: str = ""):
     """Log user actions for audit purposes"""
-    log_entry = {
-        'user_id': user_id,
-        'action': action,
-        'details': details,
-        'timestamp': str(datetime.utcnow())
-    }
-    
-    logger.info(f"User action: {json.dumps(log_entry)}")
+    _audit_logger.info(
+        f"User action: uid={user_id} act={action} det={details} "
+        f"ts={datetime.now(timezone.utc).isoformat()}"
+    )
 
 
 def truncate_text(text: str, max_length: int = 100) -> str: